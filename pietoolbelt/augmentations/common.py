@@ -1,11 +1,21 @@
+import math
+import random
 from abc import ABCMeta, abstractmethod
 
 import cv2
 import numpy as np
-from albumentations import Compose, OneOf, HorizontalFlip, GaussNoise, RandomBrightnessContrast, RandomGamma, Rotate, \
-    ImageCompression, CLAHE, Downscale, ISONoise, MotionBlur
+import torch
+from albumentations import Compose, OneOf, HorizontalFlip, Rotate, ImageCompression, CLAHE, Downscale, ISONoise, MotionBlur, \
+    ImageOnlyTransform
+from numba import njit
 
-__all__ = ['to_quad', 'BaseAugmentations']
+try:
+    from albucore import sz_lut as _apply_table  # albumentations >= 1.4 dependency with faster than cv2.LUT table lookup
+except ImportError:
+    def _apply_table(img: np.ndarray, table: np.ndarray, inplace: bool = False) -> np.ndarray:
+        return cv2.LUT(img, table)
+
+__all__ = ['to_quad', 'FusedPhotometric', 'BaseAugmentations']
 
 
 def to_quad(force_apply=False, **kwargs):
@@ -34,29 +44,108 @@ def to_quad(force_apply=False, **kwargs):
     return {'image': image_tmp}
 
 
+@njit(cache=True, fastmath=True)
+def _fused_photometric(src: np.ndarray, noise: np.ndarray, table: np.ndarray, dst: np.ndarray):
+    for i in range(src.shape[0]):
+        val = min(max(np.float32(src[i]) + noise[i], np.float32(0)), np.float32(255))
+        dst[i] = table[np.int32(val)]
+
+
+class FusedPhotometric(ImageOnlyTransform):
+    """
+    Gaussian noise and brightness, contrast or gamma change, fused into single pass over uint8 image.
+    Equivalent of ``Compose([GaussNoise(p=noise_p), OneOf([RandomBrightnessContrast(), RandomGamma()], p=photometric_p)])``
+
+    Brightness, contrast and gamma folds into 256-entry table (values truncates like in albumentations), so noise is the only
+    per-pixel floating-point work. Without noise only table lookup performs
+
+    Args:
+        brightness_limit: brightness change limit as part of max value
+        contrast_limit: contrast change limit
+        gamma_limit: gamma limits, multiplied by 100
+        noise_var_limit: variance limits of gaussian noise
+        noise_p: probability of noise applying
+        photometric_p: probability of brightness and contrast or gamma change (both are equiprobable)
+        p: probability of applying the transform
+    """
+
+    def __init__(self, brightness_limit: float = 0.2, contrast_limit: float = 0.2, gamma_limit: [float, float] = (80, 120),
+                 noise_var_limit: [float, float] = (10., 50.), noise_p: float = 0.5, photometric_p: float = 0.5, p: float = 1.):
+        super().__init__(p=p)
+        self.brightness_limit = brightness_limit
+        self.contrast_limit = contrast_limit
+        self.gamma_limit = gamma_limit
+        self.noise_var_limit = noise_var_limit
+        self.noise_p = noise_p
+        self.photometric_p = photometric_p
+
+    def get_params(self) -> dict:
+        rand = getattr(self, 'py_random', random)  # albumentations >= 2.0 seeds transform own generator
+
+        alpha, beta, gamma = 1., 0., 1.
+        if rand.random() < self.photometric_p:
+            if rand.random() < 0.5:
+                alpha = 1 + rand.uniform(-self.contrast_limit, self.contrast_limit)
+                beta = rand.uniform(-self.brightness_limit, self.brightness_limit) * 255
+            else:
+                gamma = rand.uniform(self.gamma_limit[0], self.gamma_limit[1]) / 100
+
+        noise_std = math.sqrt(rand.uniform(self.noise_var_limit[0], self.noise_var_limit[1])) if rand.random() < self.noise_p else 0.
+        return {'alpha': alpha, 'beta': beta, 'gamma': gamma, 'noise_std': noise_std, 'noise_seed': rand.randrange(2 ** 16)}
+
+    @staticmethod
+    def _make_table(alpha: float, beta: float, gamma: float) -> np.ndarray:
+        table = np.clip(np.arange(256, dtype=np.float32) * alpha + beta, 0, 255).astype(np.uint8)
+        if gamma != 1:
+            table = ((table / 255) ** gamma * 255).astype(np.uint8)
+        return table
+
+    def apply(self, img: np.ndarray, alpha: float = 1., beta: float = 0., gamma: float = 1., noise_std: float = 0., noise_seed: int = 0,
+              **params) -> np.ndarray:
+        if img.dtype != np.uint8:
+            raise TypeError("FusedPhotometric supports only uint8 images, but got image with dtype {}".format(img.dtype))
+
+        is_photometric = alpha != 1 or beta != 0 or gamma != 1
+        if noise_std <= 0:
+            return _apply_table(img, self._make_table(alpha, beta, gamma), False) if is_photometric else img
+
+        table = self._make_table(alpha, beta, gamma) if is_photometric else np.arange(256, dtype=np.uint8)
+        noise = np.empty(img.shape, dtype=np.float32)
+        cv2.setRNGSeed(noise_seed)
+        cv2.randn(noise.reshape(img.shape[0], -1), 0, noise_std)  # single-channel view, else noise fills only first channel
+
+        res = np.empty(img.shape, dtype=np.uint8)
+        _fused_photometric(np.ascontiguousarray(img).reshape(-1), noise.reshape(-1), table, res.reshape(-1))
+        return res
+
+    def get_transform_init_args_names(self) -> tuple:
+        return 'brightness_limit', 'contrast_limit', 'gamma_limit', 'noise_var_limit', 'noise_p', 'photometric_p'
+
+
+def _train_augmentations() -> OneOf:
+    """
+    Train augmentations, that are common for all tasks. Every call builds new transforms, because albumentations ``Compose``
+    configures it's children (processors, random state), so transforms can't be shared between pipelines
+    """
+    return OneOf([
+        Compose([
+            HorizontalFlip(p=0.5),
+            FusedPhotometric(noise_p=0.5, photometric_p=0.5),
+            Rotate(limit=20, border_mode=cv2.BORDER_CONSTANT),
+            ImageCompression(),
+            CLAHE(),
+            Downscale(scale_min=0.2, scale_max=0.9, p=0.5),
+            ISONoise(p=0.5),
+            MotionBlur(p=0.5)
+        ]),
+        HorizontalFlip(p=0.5)
+    ])
+
+
 class BaseAugmentations(metaclass=ABCMeta):
     def __init__(self, is_train: bool, to_pytorch: bool, preprocess: callable):
         if is_train:
-            self._aug = Compose([
-                preprocess,
-                OneOf([
-                    Compose([
-                        HorizontalFlip(p=0.5),
-                        GaussNoise(p=0.5),
-                        OneOf([
-                            RandomBrightnessContrast(),
-                            RandomGamma(),
-                        ], p=0.5),
-                        Rotate(limit=20, border_mode=cv2.BORDER_CONSTANT),
-                        ImageCompression(),
-                        CLAHE(),
-                        Downscale(scale_min=0.2, scale_max=0.9, p=0.5),
-                        ISONoise(p=0.5),
-                        MotionBlur(p=0.5)
-                    ]),
-                    HorizontalFlip(p=0.5)
-                ])
-            ], p=1)
+            self._aug = Compose([preprocess, _train_augmentations()], p=1)
         else:
             self._aug = preprocess
 
@@ -72,4 +161,16 @@ class BaseAugmentations(metaclass=ABCMeta):
 
         Returns:
             dict of augmented data with structure as input `data`
-        """
\ No newline at end of file
+        """
+
+    @staticmethod
+    def img_to_pytorch(image: np.ndarray) -> torch.Tensor:
+        """
+        Convert HWC uint8 image to normalized float32 tensor with shape (1, C, H, W)
+
+        Output buffer allocates once in target layout and filled in-place, so resulted tensor is contiguous
+        """
+        res = np.empty((1, image.shape[2], image.shape[0], image.shape[1]), dtype=np.float32)
+        np.multiply(np.moveaxis(image, -1, 0), np.float32(1 / 128), out=res[0])
+        np.subtract(res, 1, out=res)
+        return torch.from_numpy(res)
@@ -23,10 +23,6 @@ class DetectionAugmentations(BaseAugmentations):
 
         return {'data': img, 'target': bboxes}
 
-    @staticmethod
-    def img_to_pytorch(image):
-        return torch.from_numpy(np.expand_dims(np.moveaxis(image, -1, 0).astype(np.float32) / 128 - 1, axis=0))
-
     @staticmethod
     def bbox_to_pytorch(bbox):
         return torch.from_numpy(np.expand_dims(bbox.astype(np.float32), axis=0))
@@ -11,18 +11,23 @@ class SegmentationAugmentations(BaseAugmentations):
         super().__init__(is_train, to_pytorch, preprocess)
 
     def augmentation(self, data: dict) -> dict:
-        augmented = self._aug(image=data['data'], mask=data['target'] / (data['target'].max() + 1e-7))
+        target = data['target']
+        augmented = self._aug(image=data['data'], mask=target)
 
         img, mask = augmented['image'], augmented['mask']
+        mask_max = target.max() + 1e-7
         if self._need_to_pytorch:
-            img, mask = self.img_to_pytorch(img), self.mask_to_pytorch(mask)
+            img, mask = self.img_to_pytorch(img), self.mask_to_pytorch(mask, mask_max)
+        else:
+            mask = np.divide(mask, mask_max, dtype=np.float32)
 
         return {'data': img, 'target': mask}
 
     @staticmethod
-    def img_to_pytorch(image):
-        return torch.from_numpy(np.expand_dims(np.moveaxis(image, -1, 0).astype(np.float32) / 128 - 1, axis=0))
-
-    @staticmethod
-    def mask_to_pytorch(mask):
-        return torch.from_numpy(np.expand_dims(mask.astype(np.float32), axis=0))
+    def mask_to_pytorch(mask: np.ndarray, max_val: float = 1) -> torch.Tensor:
+        """
+        Convert mask to float32 tensor with shape (1, ...), normalized by ``max_val`` in the same pass
+        """
+        res = np.empty((1,) + mask.shape, dtype=np.float32)
+        np.divide(mask, max_val, out=res[0], dtype=np.float32)
+        return torch.from_numpy(res)
@@ -1,6 +1,7 @@
 import os
 import numpy as np
 from abc import ABCMeta, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 
 from piepline.data_producer import AbstractDataset
 
@@ -78,6 +79,7 @@ class BasicDataset(IndexedDataset):
     def __init__(self, items: list):
         super().__init__()
         self._items = items
+        self._fetch_workers_num = None
 
     def get_items(self) -> list:
         """
@@ -99,6 +101,21 @@ class BasicDataset(IndexedDataset):
             One item, that
         """
 
+    def set_fetch_workers(self, workers_num: int = None) -> 'BasicDataset':
+        """
+        Set number of threads, that used for fetching batch of items by ``__getitems__``. Threads are efficient when items
+        interpretation releases GIL (e.g. images reading by OpenCV)
+
+        ``WARNING``: batch fetches by ``__getitems__`` only when dataset passed directly to PyTorch ``DataLoader``. Wrappers from
+        ``pietoolbelt.datasets.utils`` forwards it, but piepline ``DataProducer`` passes itself to ``DataLoader`` and
+        fetches items one by one, so in this case threads aren't used
+
+        Args:
+            workers_num: number of threads. If None - items fetches sequentially
+        """
+        self._fetch_workers_num = workers_num
+        return self
+
     def remove_unused_data(self):
         self._items = [self._items[idx] for idx in self._indices]
         self._use_indices = False
@@ -113,3 +130,13 @@ class BasicDataset(IndexedDataset):
             return self._interpret_item(self._items[self._indices[idx]])
         else:
             return self._interpret_item(self._items[idx])
+
+    def __getitems__(self, indices: list) -> list:
+        """
+        Get batch of items. This method used by PyTorch ``DataLoader`` for fetching whole batch by one call
+        """
+        if self._fetch_workers_num is None or len(indices) < 2:
+            return [self[idx] for idx in indices]
+
+        with ThreadPoolExecutor(max_workers=min(self._fetch_workers_num, len(indices))) as pool:
+            return list(pool.map(self.__getitem__, indices))
@@ -1,3 +1,6 @@
+import hashlib
+import os
+import threading
 from typing import List, Tuple
 
 import numpy as np
@@ -9,6 +12,15 @@ from pietoolbelt.utils import put_to_dict, get_from_dict
 __all__ = ['EmptyClassesAdd', 'AugmentedDataset', 'InstanceSegmentationDataset', 'DatasetsContainer', 'DataFlow']
 
 
+def _get_items(dataset: AbstractDataset, indices: list) -> list:
+    """
+    Get batch of items from dataset by ``__getitems__``, if dataset supports it
+    """
+    if hasattr(dataset, '__getitems__'):
+        return dataset.__getitems__(indices)
+    return [dataset[idx] for idx in indices]
+
+
 class EmptyClassesAdd(AbstractDataset):
     def __init__(self, dataset, target_classes_num: int, exists_class_idx: int):
         if target_classes_num <= exists_class_idx:
@@ -20,7 +32,12 @@ class EmptyClassesAdd(AbstractDataset):
         self._exists_class_idx = exists_class_idx
 
     def __getitem__(self, item):
-        cur_res = self._dataset[item]
+        return self._add_classes(self._dataset[item])
+
+    def __getitems__(self, indices: list) -> list:
+        return [self._add_classes(res) for res in _get_items(self._dataset, indices)]
+
+    def _add_classes(self, cur_res: dict) -> dict:
         res = {'data': cur_res['data']}
         target_shape = cur_res['target'].shape
         if len(target_shape) > 3:
@@ -44,6 +61,7 @@ class AugmentedDataset(AbstractDataset):
     def __init__(self, dataset):
         self._dataset = dataset
         self._augs = {}
+        self._keyed_augs = []
         self._augs_for_whole = []
 
     def add_aug(self, aug: callable, identificator=None) -> 'AugmentedDataset':
@@ -51,13 +69,20 @@ class AugmentedDataset(AbstractDataset):
             self._augs_for_whole.append(aug)
         else:
             self._augs[identificator] = aug
+            self._keyed_augs = list(self._augs.items())
         return self
 
     def __getitem__(self, item):
-        res = self._dataset[item]
-        for k, v in res.items() if isinstance(res, dict) else enumerate(res):
-            if k in self._augs:
-                res[k] = self._augs[k](v)
+        return self._augment(self._dataset[item])
+
+    def __getitems__(self, indices: list) -> list:
+        return [self._augment(res) for res in _get_items(self._dataset, indices)]
+
+    def _augment(self, res):
+        keys = res if isinstance(res, dict) else range(len(res))
+        for k, aug in self._keyed_augs:
+            if k in keys:
+                res[k] = aug(res[k])
         for aug in self._augs_for_whole:
             res = aug(res)
         return res
@@ -73,19 +98,113 @@ class InstanceSegmentationDataset(AbstractDataset):
 
         self._border_thickness = None
         self._border_cls_pos = None
+        self._cache_dir = None
+        self._cache_lock = threading.Lock()
+        self._targets_cache = None
+        self._targets_cache_index = None
 
     def enable_border(self, thickness: int, border_cls_position: int = 1) -> 'InstanceSegmentationDataset':
+        """
+        Enable borders between instances. If targets cache enabled, it will be loaded (or built) for new borders configuration
+        """
         self._border_thickness = thickness
         self._border_cls_pos = border_cls_position
+        self._targets_cache, self._targets_cache_index = None, None
         return self
 
+    def enable_target_cache(self, cache_dir: str) -> 'InstanceSegmentationDataset':
+        """
+        Cache composed targets on disk. All targets composes once and packs to the single file, that than maps to memory.
+        Index of file contains offset and shape of every target. Cache loads (or builds, if it doesn't exist) on first item
+        access, so borders may be configured after this call. Worker processes loads cache by themselves, so build it before
+        multiprocess loading by access to any item
+
+        ``WARNING``: cache keyed by item index, so don't share one cache directory between datasets with different items.
+        Cache rebuilds only if it doesn't match to dataset length, so reindexed dataset with the same length isn't detected
+
+        Args:
+            cache_dir: path to directory for cached targets
+        """
+        self._cache_dir = cache_dir
+        self._targets_cache, self._targets_cache_index = None, None
+        return self
+
+    def _load_target_cache(self):
+        os.makedirs(self._cache_dir, exist_ok=True)
+
+        config_hash = hashlib.md5(str((self._border_thickness, self._border_cls_pos)).encode()).hexdigest()[:8]
+        data_path = os.path.join(self._cache_dir, 'targets_{}.bin'.format(config_hash))
+        index_path = os.path.join(self._cache_dir, 'targets_{}.npy'.format(config_hash))
+
+        index = np.load(index_path) if os.path.exists(index_path) and os.path.exists(data_path) else None
+        if index is None or not self._is_target_cache_valid(index, os.path.getsize(data_path)):
+            index = self._build_target_cache(data_path, index_path)
+
+        self._targets_cache_index = index  # index first, because items reads cache without lock, when it's not None
+        if os.path.getsize(data_path) > 0:
+            self._targets_cache = np.memmap(data_path, dtype=np.uint8, mode='r')
+        else:
+            self._targets_cache = np.empty(0, dtype=np.uint8)
+
+    def _is_target_cache_valid(self, index: np.ndarray, data_size: int) -> bool:
+        if len(index) != len(self._dataset):
+            return False
+        return int((index[:, 1] * index[:, 2] * np.maximum(index[:, 3], 1)).sum()) == data_size
+
+    def _build_target_cache(self, data_path: str, index_path: str) -> np.ndarray:
+        index = np.zeros((len(self._dataset), 4), dtype=np.int64)  # offset, height, width, channels (0 for 2D target)
+
+        offset = 0
+        tmp_data_path, tmp_index_path = [p + '.{}.tmp'.format(os.getpid()) for p in [data_path, index_path]]
+        with open(tmp_data_path, 'wb') as data_file:
+            for item in range(len(self._dataset)):
+                target = np.ascontiguousarray(self._compose_target(self._dataset[item][self._target_key]), dtype=np.uint8)
+                index[item] = offset, target.shape[0], target.shape[1], target.shape[2] if target.ndim > 2 else 0
+                data_file.write(target.tobytes())
+                offset += target.size
+
+        with open(tmp_index_path, 'wb') as index_file:
+            np.save(index_file, index)
+
+        os.replace(tmp_data_path, data_path)
+        os.replace(tmp_index_path, index_path)
+        return index
+
+    def __getstate__(self) -> dict:
+        # lock can't be pickled and memory map would be pickled with all data, so worker process loads cache by itself
+        state = self.__dict__.copy()
+        state['_cache_lock'], state['_targets_cache'], state['_targets_cache_index'] = None, None, None
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._cache_lock = threading.Lock()
+
     def __len__(self):
         return len(self._dataset)
 
     def __getitem__(self, item: int):
-        res = self._dataset[item]
+        return self._process_target(self._dataset[item], item)
+
+    def __getitems__(self, indices: list) -> list:
+        return [self._process_target(res, item) for res, item in zip(_get_items(self._dataset, indices), indices)]
 
-        target = res[self._target_key]
+    def _process_target(self, res: dict, item: int) -> dict:
+        if self._cache_dir is None:
+            res[self._target_key] = self._compose_target(res[self._target_key])
+        else:
+            if self._targets_cache is None:
+                with self._cache_lock:
+                    if self._targets_cache is None:
+                        self._load_target_cache()
+
+            offset, height, width, channels = self._targets_cache_index[item]
+            shape = (height, width, channels) if channels > 0 else (height, width)
+            # copy, because memory map is read-only and shared between items calls
+            res[self._target_key] = np.array(self._targets_cache[offset: offset + int(np.prod(shape))].reshape(shape))
+        return res
+
+    def _compose_target(self, target: dict) -> np.ndarray:
         target_shape = (target['size']['height'], target['size']['width'])
         composer = MasksComposer(target_shape)
 
@@ -99,8 +218,7 @@ class InstanceSegmentationDataset(AbstractDataset):
         for obj in target['masks']:
             composer.add_mask(obj[0], 0, offset=obj[1])
 
-        res[self._target_key] = composer.compose()
-        return res
+        return composer.compose()
 
 
 class DatasetsContainer(BasicDataset):
@@ -115,22 +233,24 @@ class DatasetsContainer(BasicDataset):
 
     def __init__(self, datasets: [AbstractDataset]):
         self._datasets = datasets
-        items = self._update_datasets_idx_space(datasets)
-        super().__init__(items)
+        self._datasets_idx, self._datasets_items_idx = self._update_datasets_idx_space(datasets)
+        super().__init__(np.arange(len(self._datasets_idx)))
 
     @staticmethod
-    def _update_datasets_idx_space(datasets: [AbstractDataset]) -> List[Tuple]:
+    def _update_datasets_idx_space(datasets: [AbstractDataset]) -> Tuple[np.ndarray, np.ndarray]:
         """
         Update idx space of datasets. Idx space used for correct mapping global idx to corresponding dataset data index
+
+        Returns:
+            two parallel arrays: index of dataset and index of item in this dataset for every global index
         """
-        items = []
-        datasets_len = [len(d) for d in datasets]
-        for dataset_idx, dataset_len in enumerate(datasets_len):
-            items.extend([(dataset_idx, i) for i in range(dataset_len)])
-        return items
+        datasets_len = np.array([len(d) for d in datasets], dtype=np.int64)
+        datasets_idx = np.repeat(np.arange(len(datasets)), datasets_len)
+        items_idx = np.arange(datasets_len.sum()) - np.repeat(np.cumsum(datasets_len) - datasets_len, datasets_len)
+        return datasets_idx, items_idx
 
     def _interpret_item(self, item) -> any:
-        return self._datasets[item[0]][item[1]]
+        return self._datasets[self._datasets_idx[item]][self._datasets_items_idx[item]]
 
 
 class DataFlow(AbstractDataset):
@@ -143,7 +263,12 @@ class DataFlow(AbstractDataset):
         return self
 
     def __getitem__(self, item):
-        src = self._dataset[item]
+        return self._swap_data(self._dataset[item])
+
+    def __getitems__(self, indices: list) -> list:
+        return [self._swap_data(src) for src in _get_items(self._dataset, indices)]
+
+    def _swap_data(self, src: dict) -> dict:
         result = {}
 
         for s in self._swap:
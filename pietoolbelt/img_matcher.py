@@ -101,9 +101,14 @@ class ImgMatcher:
         self._calc_base_contour()
 
         mask = np.zeros(self._composed_shape, dtype=np.uint8)
-        warped_mask = cv2.fillPoly(mask.copy(), [self._warped_contour], 1)
-        base_mask = cv2.fillPoly(mask.copy(), [self._base_contour], 1)
-        mask[(warped_mask + base_mask) > 1] = 255
+        cv2.fillPoly(mask, [self._warped_contour], 255)
+
+        # base contour is an axis-aligned rectangle, so intersection with it is just clearing of everything outside it
+        (x0, y0), (x1, y1) = self._base_contour.min(0), self._base_contour.max(0) + 1
+        mask[:y0] = 0
+        mask[y1:] = 0
+        mask[:, :x0] = 0
+        mask[:, x1:] = 0
 
         return mask
 
@@ -193,7 +198,7 @@ class ImgMatcher:
         if self._base_contour is None:
             bh, bw = self._base_img.img.shape[:2]
             base_pts = np.array([[0, 0], [0, bh - 1], [bw - 1, bh - 1], [bw - 1, 0]])
-            self._base_contour = (base_pts + self._base_img_offset).astype(np.int)
+            self._base_contour = (base_pts + self._base_img_offset).astype(np.int32)
 
         return self._base_contour
 
@@ -206,6 +211,6 @@ class ImgMatcher:
 
             self._calc_composed_shape()
 
-            self._warped_contour = (matched_box - self._warped_offset + self._add_img_offset).astype(np.int)
+            self._warped_contour = (matched_box - self._warped_offset + self._add_img_offset).astype(np.int32)
 
         return self._warped_contour
@@ -1,76 +1,119 @@
+import threading
+
 import numpy as np
 import cv2
 
 __all__ = ['MasksComposer']
 
 
+class _Scratch(threading.local):
+    """
+    Per-thread pool of working buffers. Composers usually created per sample, so buffers shared between them
+    """
+
+    def __init__(self):
+        self._buffers = {}
+
+    def get(self, name: str, shape: tuple, dtype: np.typename) -> np.ndarray:
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        buf = self._buffers.get(name)
+        if buf is None or buf.size < size:
+            buf = np.empty(size, dtype=np.uint8)
+            self._buffers[name] = buf
+        return buf[:size].view(dtype).reshape(shape)
+
+
+_scratch = _Scratch()
+
+
 class MasksComposer:
-    def __init__(self, target_shape: [], dtype: np.typename = np.uint8):
-        self._masks = {}
-        self._mask_shape = target_shape
-        self._type = dtype
+    """
+    Masks composer. Masks of every class stores in preallocated buffer of shape (classes_num, 2, H, W),
+    where the second channel of class contains borders between class masks (zeros if borders disabled for the class).
+    Borders accumulates bit-packed along width and unpacks to the buffer on ``compose``
+
+    Args:
+        target_shape: shape of composed mask (H, W)
+        dtype: type of composed mask. For borders it must be supported by ``cv2.dilate`` (uint8, uint16, int16, float32, float64)
+        classes_num: number of classes. Classes indices passed to ``add_mask`` must be less than this number
+    """
 
-        self._borders_as_class = False
-        self._borders_between_classes = None
+    def __init__(self, target_shape: [], dtype: np.typename = np.uint8, classes_num: int = 1):
+        self._buf = np.zeros((classes_num, 2, target_shape[0], target_shape[1]), dtype=dtype)
+        self._borders_between_classes = set()
+        self._packed_borders = None
         self._dilate_masks_kernel = None
 
     def add_borders_as_class(self, between_classes: [] = None, dilate_masks_kernel: np.ndarray = np.ones((2, 2), dtype=np.uint8)) -> 'MasksComposer':
-        self._borders_as_class = True
-        self._borders_between_classes = between_classes
+        if between_classes is None:
+            between_classes = range(self._buf.shape[0])
+        self._borders_between_classes = set(between_classes)
+        self._packed_borders = np.zeros((self._buf.shape[0], self._buf.shape[2], (self._buf.shape[3] + 7) // 8), dtype=np.uint8)
         self._dilate_masks_kernel = dilate_masks_kernel
+        return self
 
-    def _calc_border_between_masks(self, mask1, mask2):
-        borders = np.zeros_like(mask1)
-        mask1_intern = cv2.dilate(mask1, self._dilate_masks_kernel)
-        mask2_intern = cv2.dilate(mask2, self._dilate_masks_kernel)
-
-        add = mask1_intern + mask2_intern
-        borders[add > 1] = 1
-        return borders
-
-    def add_mask(self, mask: np.ndarray, cls, offset: np.ndarray = None):
-        if cls not in self._masks:
-            self._masks[cls] = np.zeros(self._mask_shape, dtype=self._type)
-
-        if self._borders_as_class and cls in self._borders_between_classes:
-            prev_borders = None
-            if offset is not None:
-                if isinstance(self._masks[cls], dict):
-                    target_mask = np.zeros_like(self._masks[cls]['mask'])
-                    prev_borders = self._masks[cls]['borders']
-                else:
-                    target_mask = np.zeros_like(self._masks[cls])
-                target_mask[offset[0]: offset[0] + mask.shape[0], offset[1]: offset[1] + mask.shape[1]] = mask
-            else:
-                target_mask = mask
-
-            origin_mask = self._masks[cls] if not isinstance(self._masks[cls], dict) else self._masks[cls]['mask']
-            borders = self._calc_border_between_masks(origin_mask, target_mask)
-
-            if prev_borders is not None:
-                borders += prev_borders
-
-            origin_mask += target_mask
-            self._masks[cls] = {'mask': np.clip(origin_mask, 0, 1), 'borders': np.clip(borders, 0, 1)}
-        else:
-            if offset is not None:
-                self._masks[cls][offset[0]: offset[0] + mask.shape[0], offset[1]: offset[1] + mask.shape[1]] += mask
-            else:
-                self._masks[cls] += mask
+    def _calc_border_between_masks(self, origin_mask: np.ndarray, packed_borders: np.ndarray, mask: np.ndarray, offset: []):
+        """
+        Accumulate to bit-packed ``packed_borders`` the borders between ``origin_mask`` and ``mask``, that will be placed by ``offset``.
+        Dilation performs only in region around the new mask, that padded by doubled kernel size and aligned to byte of packed borders
+        """
+        kh, kw = self._dilate_masks_kernel.shape[:2]
+        y, x = offset[0], offset[1]
+        y0, x0 = max(y - 2 * kh, 0), max(x - 2 * kw, 0)
+        x0 -= x0 % 8
+        y1, x1 = min(y + mask.shape[0] + 2 * kh, origin_mask.shape[0]), min(x + mask.shape[1] + 2 * kw, origin_mask.shape[1])
+
+        region_shape, dtype = (y1 - y0, x1 - x0), origin_mask.dtype
+        target = cv2.copyMakeBorder(mask.astype(dtype, copy=False), y - y0, y1 - y - mask.shape[0], x - x0, x1 - x - mask.shape[1],
+                                    cv2.BORDER_CONSTANT, dst=_scratch.get('target', region_shape, dtype), value=0)
+        mask1_intern = cv2.dilate(origin_mask[y0: y1, x0: x1], self._dilate_masks_kernel,
+                                  dst=_scratch.get('mask1_intern', region_shape, dtype))
+        mask2_intern = cv2.dilate(target, self._dilate_masks_kernel, dst=_scratch.get('mask2_intern', region_shape, dtype))
 
-        self._masks[cls][self._masks[cls] > 1] = 1
+        # packbits treats any non-zero value as 1, so borders are just bitwise intersection of packed dilated masks.
+        # packbits accepts only integer or boolean arrays, so other types converts to boolean
+        if dtype.kind not in 'biu':
+            mask1_intern, mask2_intern = mask1_intern > 0, mask2_intern > 0
+        borders = np.packbits(mask1_intern, axis=-1)
+        borders &= np.packbits(mask2_intern, axis=-1)
+
+        borders_crop = packed_borders[y0: y1, x0 // 8: x0 // 8 + borders.shape[1]]
+        borders_crop |= borders
+
+    def add_mask(self, mask: np.ndarray, cls: int, offset: np.ndarray = None):
+        if offset is None:
+            offset = (0, 0)
+
+        origin_mask = self._buf[cls, 0]
+        if cls in self._borders_between_classes:
+            self._calc_border_between_masks(origin_mask, self._packed_borders[cls], mask, offset)
+
+        origin_crop = origin_mask[offset[0]: offset[0] + mask.shape[0], offset[1]: offset[1] + mask.shape[1]]
+        np.maximum(origin_crop, mask, out=origin_crop)
+        np.clip(origin_crop, 0, 1, out=origin_crop)
 
     def compose(self) -> np.ndarray:
-        res = None
-        for cls, mask in self._masks.items():
-            if res is None:
-                if isinstance(mask, dict):
-                    res = np.stack((mask['mask'], mask['borders']), axis=2)
-                else:
-                    res = mask
-            else:
-                if isinstance(mask, dict):
-                    res = np.stack((res, mask['mask'], mask['borders']), axis=2)
-                else:
-                    res = np.stack((res, mask), axis=0)
-        return res
+        """
+        Compose masks
+
+        Returns:
+            mask of shape (H, W, C), where for every class placed mask channel and borders channel (if borders enabled for the class).
+            If result contains only one channel - mask of shape (H, W) returned
+        """
+        classes_num, _, height, width = self._buf.shape
+        with_borders = [cls in self._borders_between_classes for cls in range(classes_num)]
+
+        for cls in range(classes_num):
+            if with_borders[cls]:
+                self._buf[cls, 1] = np.unpackbits(self._packed_borders[cls], axis=-1, count=width)
+
+        if all(with_borders):
+            channels = self._buf.reshape(-1, height, width)
+        elif not any(with_borders):
+            channels = self._buf[:, 0]
+        else:
+            channels = self._buf.reshape(-1, height, width)[[i for i in range(2 * classes_num) if i % 2 == 0 or with_borders[i // 2]]]
+
+        if channels.shape[0] == 1:
+            return channels[0]
+        return channels.transpose(1, 2, 0)
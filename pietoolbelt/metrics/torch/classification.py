@@ -65,7 +65,7 @@ class _ClassificationMetric(AbstractMetric):
             np.ndarray of shape [B]
         """
         val_internal = val.data.cpu().numpy()
-        return np.squeeze(np.clip(val_internal, 0, 1).astype(np.int))
+        return np.squeeze(np.clip(val_internal, 0, 1).astype(np.int32))
 
     def calc(self, predict: Tensor, target: Tensor) -> np.ndarray or float:
         """
@@ -26,28 +26,14 @@ class Bagging:
         with open(os.path.join(self._path, 'meta.json'), 'r') as meta_file:
             predicts_config = json.load(meta_file)
 
-        all_predicts = []
-        headers = None
-        for model in predicts_config:
-            cur_fold_dir = model['path']
-
-            with open(os.path.join(self._path, cur_fold_dir, self._predicts_names), 'r') as pred_file:
-                predicts = np.loadtxt(pred_file, delimiter=',', dtype=str)
-                if self._with_headers:
-                    if headers is None:
-                        headers = [str(p) for p in predicts[0]]
-                    predicts = predicts[1:].astype(np.float32)
-                else:
-                    predicts = predicts.astype(np.float32)
-            with open(os.path.join(self._path, cur_fold_dir, self._targets_names), 'r') as ref_file:
-                targets = np.loadtxt(ref_file, delimiter=',', dtype=str)
-                targets = (targets[1:] if self._with_headers else targets).astype(np.float32)
-
-            all_predicts.append({'predicts': predicts, 'targets': targets,
-                                 'model': [{'path': model['path'], 'model': model['model'], 'fold': model['fold']}]})
+        load_args = [[os.path.join(self._path, model['path']), model, self._predicts_names, self._targets_names, self._with_headers]
+                     for model in predicts_config]
+        with Pool(self._workers_num) as pool:
+            loaded = pool.map(Bagging._load_model_predicts, load_args)
 
+        all_predicts = [predict for predict, _ in loaded]
         if self._with_headers:
-            return all_predicts, headers
+            return all_predicts, loaded[0][1] if len(loaded) > 0 else None
         else:
             return all_predicts
 
@@ -108,6 +94,24 @@ class Bagging:
 
         return best_predict
 
+    @staticmethod
+    def _load_model_predicts(data: []) -> [dict, list]:
+        fold_path, model, predicts_names, targets_names, with_headers = data
+
+        headers = None
+        with open(os.path.join(fold_path, predicts_names), 'r') as pred_file:
+            predicts = np.loadtxt(pred_file, delimiter=',', dtype=str)
+            if with_headers:
+                headers = [str(p) for p in predicts[0]]
+                predicts = predicts[1:]
+            predicts = predicts.astype(np.float32)
+        with open(os.path.join(fold_path, targets_names), 'r') as ref_file:
+            targets = np.loadtxt(ref_file, delimiter=',', dtype=str)
+            targets = (targets[1:] if with_headers else targets).astype(np.float32)
+
+        return {'predicts': predicts, 'targets': targets,
+                'model': [{'path': model['path'], 'model': model['model'], 'fold': model['fold']}]}, headers
+
     @staticmethod
     def _merge_predicts(predicts: []) -> dict:
         res_predict = np.median([p['predicts'] for p in predicts], axis=0)
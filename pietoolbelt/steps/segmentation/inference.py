@@ -91,7 +91,7 @@ class SegmentationInference:
 
         while cv2.waitKey(1) & 0xFF != ord('q'):
             ret, frame = cap.read()
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=frame)
 
             frame, res = self.run_image(frame)
             image = self.vis_result(frame, res)
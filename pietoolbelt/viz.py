@@ -2,6 +2,7 @@ from abc import ABCMeta, abstractmethod
 
 import cv2
 import numpy as np
+from numba import njit, prange
 
 __all__ = ['AbstractVisualizer', 'ColormapVisualizer', 'MulticlassColormapVisualizer', 'DetectionVisualiser']
 
@@ -52,27 +53,65 @@ class ContourVisualizer(AbstractVisualizer):
         return cv2.drawContours(image, cntrs, -1, self._color, self._thick)
 
 
+@njit(parallel=True, cache=True)
+def _overlay(img: np.ndarray, other: np.ndarray, colors: np.ndarray):
+    """
+    Paint pixels of every class from ``other`` (HxWxC) by corresponding colors from ``colors`` (3xC) in a single pass.
+    Later classes overrides earlier
+    """
+    for y in prange(img.shape[0]):
+        for x in range(img.shape[1]):
+            for c in range(other.shape[2]):
+                if other[y, x, c] > 0:
+                    img[y, x, 0] = colors[0, c]
+                    img[y, x, 1] = colors[1, c]
+                    img[y, x, 2] = colors[2, c]
+
+
 class MulticlassColormapVisualizer(ColormapVisualizer):
-    def __init__(self, main_class: int, proportions: [float, float], colormap=cv2.COLORMAP_JET, other_colors: [] = None):
+    """
+    Visualizer, that draws main class by colormap and other classes by solid colors
+
+    Args:
+        main_class: index of main class in mask
+        proportions: proportions of image and colormap
+        colormap: colormap for main class
+        other_colors: colors table of shape (3, C) for other classes. If None - colors generates. If passed table has less colors,
+            than mask has other classes, ``ValueError`` raises
+        other_classes_num: number of other classes. If passed, colors table generates in constructor, otherwise on first call
+    """
+
+    def __init__(self, main_class: int, proportions: [float, float], colormap=cv2.COLORMAP_JET, other_colors: [] = None,
+                 other_classes_num: int = None):
         super().__init__(proportions, colormap)
 
         self._main_class = main_class
-        self._other_colors = other_colors
+        self._is_colors_given = other_colors is not None
+        if other_colors is not None:
+            self._other_colors = np.ascontiguousarray(other_colors, dtype=np.uint8)
+        elif other_classes_num is not None:
+            self._other_colors = self._generate_colors(other_classes_num)
+        else:
+            self._other_colors = None
+
+    @staticmethod
+    def _generate_colors(classes_num: int) -> np.ndarray:
+        return np.array([np.linspace(127, 0, num=classes_num, dtype=np.uint8),
+                         np.linspace(255, 127, num=classes_num, dtype=np.uint8),
+                         np.linspace(127, 255, num=classes_num, dtype=np.uint8)], dtype=np.uint8)
 
     def process_img(self, image, mask) -> np.ndarray:
         main_target = mask[:, :, self._main_class]
         other_classes = np.delete(mask, self._main_class, 2)
         img = super().process_img(image, main_target)
 
-        if self._other_colors is None:
-            self._other_colors = np.array([np.linspace(127, 0, num=other_classes.shape[0], dtype=np.uint8),
-                                           np.linspace(255, 127, num=other_classes.shape[0], dtype=np.uint8),
-                                           np.linspace(127, 255, num=other_classes.shape[0], dtype=np.uint8)], dtype=np.uint8)
-        for i in range(other_classes.shape[2]):
-            cls = other_classes[:, :, i]
-            img[:, :, 0][cls > 0] = self._other_colors[0][i]
-            img[:, :, 1][cls > 0] = self._other_colors[1][i]
-            img[:, :, 2][cls > 0] = self._other_colors[2][i]
+        if self._other_colors is None or self._other_colors.shape[1] < other_classes.shape[2]:
+            if self._is_colors_given:
+                raise ValueError("Colors table has {} colors, but mask has {} other classes".format(self._other_colors.shape[1],
+                                                                                                  other_classes.shape[2]))
+            self._other_colors = self._generate_colors(other_classes.shape[2])
+
+        _overlay(img, other_classes, self._other_colors)
         return img
 
 
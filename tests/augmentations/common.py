@@ -0,0 +1,49 @@
+import unittest
+
+import numpy as np
+from albumentations import Compose
+
+from pietoolbelt.augmentations.common import FusedPhotometric
+
+__all__ = ['FusedPhotometricTest']
+
+
+class FusedPhotometricTest(unittest.TestCase):
+    def setUp(self):
+        self._img = np.random.randint(0, 256, (31, 47, 3), dtype=np.uint8)
+
+    def test_identity(self):
+        res = FusedPhotometric().apply(self._img, alpha=1., beta=0., gamma=1., noise_std=0.)
+        self.assertIs(res, self._img)
+
+    def test_apply(self):
+        for alpha, beta, gamma in [(1.15, -20., 1.), (0.85, 30., 1.), (1., 0., 0.8), (1., 0., 1.2)]:
+            with self.subTest(alpha=alpha, beta=beta, gamma=gamma):
+                res = FusedPhotometric().apply(self._img, alpha=alpha, beta=beta, gamma=gamma, noise_std=0.)
+
+                expected = np.clip(self._img.astype(np.float32) * alpha + beta, 0, 255).astype(np.uint8)
+                expected = (255 * (expected / 255) ** gamma).astype(np.uint8)
+                self.assertEqual(res.dtype, np.uint8)
+                self.assertTrue(np.array_equal(res, expected))
+
+    def test_noise(self):
+        img = np.full((64, 64, 3), 127, dtype=np.uint8)
+        res = FusedPhotometric().apply(img, alpha=1., beta=0., gamma=1., noise_std=5., noise_seed=1)
+        self.assertTrue(np.array_equal(res, FusedPhotometric().apply(img, alpha=1., beta=0., gamma=1., noise_std=5., noise_seed=1)))
+
+        diff = res.astype(np.float32) - img
+        self.assertLess(abs(diff.mean() + 0.5), 0.2)  # values truncates, so mean shifts by half of level
+        self.assertLess(abs(diff.std() - 5), 0.5)
+
+    def test_seed(self):
+        results = [Compose([FusedPhotometric(noise_p=1, photometric_p=1)], seed=42)(image=self._img)['image'] for _ in range(2)]
+        self.assertTrue(np.array_equal(results[0], results[1]))
+
+    def test_grayscale(self):
+        img = self._img[:, :, 0]
+        res = FusedPhotometric().apply(img, alpha=1.1, beta=5., gamma=1., noise_std=3.)
+        self.assertEqual(res.shape, img.shape)
+
+    def test_not_uint8(self):
+        with self.assertRaises(TypeError):
+            FusedPhotometric().apply(self._img.astype(np.float32), alpha=1.1, beta=0., gamma=1., noise_std=0.)
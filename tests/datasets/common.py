@@ -57,3 +57,8 @@ class BasicDatasetTest(unittest.TestCase):
 
         self.assertTrue(os.path.exists('test_indices.npy') and os.path.isfile('test_indices.npy'))
         os.remove('test_indices.npy')
+
+    def test_getitems(self):
+        dataset = SimpleDataset().set_indices([1, 2, 3, 7, 9])
+        self.assertEqual(dataset.__getitems__([4, 0, 2]), [9, 1, 3])
+        self.assertEqual(dataset.set_fetch_workers(2).__getitems__([4, 0, 2]), [9, 1, 3])
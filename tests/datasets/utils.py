@@ -1,9 +1,14 @@
+import os
+import pickle
+import shutil
 import unittest
 
-from pietoolbelt.datasets.utils import DatasetsContainer
+import numpy as np
+
+from pietoolbelt.datasets.utils import DatasetsContainer, InstanceSegmentationDataset, AugmentedDataset, EmptyClassesAdd, DataFlow
 from pietoolbelt.datasets.common import BasicDataset
 
-__all__ = ['DatasetsContainerTest']
+__all__ = ['DatasetsContainerTest', 'InstanceSegmentationDatasetTest', 'WrappersBatchFetchingTest']
 
 
 class SimpleDataset(BasicDataset):
@@ -18,3 +23,106 @@ class SimpleDataset(BasicDataset):
 class DatasetsContainerTest(unittest.TestCase):
     def test_initialisation(self):
         dataset = DatasetsContainer([SimpleDataset(), SimpleDataset()])
+
+    def test_items_mapping(self):
+        dataset = DatasetsContainer([SimpleDataset(), SimpleDataset().set_indices([3, 5]), SimpleDataset()])
+        self.assertEqual(len(dataset), 22)
+        self.assertEqual([dataset[i] for i in range(len(dataset))], list(range(10)) + [3, 5] + list(range(10)))
+
+
+class SimpleInstancesDataset(BasicDataset):
+    def __init__(self, items_num: int = 3):
+        super().__init__(list(range(items_num)))
+
+    def _interpret_item(self, item) -> any:
+        masks = [(np.ones((3, 4), dtype=np.uint8), np.array([i, i + item])) for i in range(3)]
+        return {'data': item, 'target': {'size': {'height': 10, 'width': 12}, 'masks': masks}}
+
+
+class InstanceSegmentationDatasetTest(unittest.TestCase):
+    def _check_cached(self, dataset: InstanceSegmentationDataset, cached_dataset: InstanceSegmentationDataset, target_shape: tuple):
+        self.assertEqual(len(dataset), len(cached_dataset))
+        for _ in range(2):
+            for i in range(len(dataset)):
+                expected, res = dataset[i], cached_dataset[i]
+                self.assertEqual(res['data'], expected['data'])
+                self.assertEqual(res['target'].shape, target_shape)
+                self.assertTrue(np.array_equal(res['target'], expected['target']))
+
+    def test_target_cache(self):
+        try:
+            dataset = InstanceSegmentationDataset(SimpleInstancesDataset())
+            cached_dataset = InstanceSegmentationDataset(SimpleInstancesDataset()).enable_target_cache('test_targets_cache')
+            self._check_cached(dataset, cached_dataset, (10, 12))
+
+            dataset = InstanceSegmentationDataset(SimpleInstancesDataset()).enable_border(2, 0)
+            cached_dataset = InstanceSegmentationDataset(SimpleInstancesDataset()).enable_border(2, 0).enable_target_cache('test_targets_cache')
+            self._check_cached(dataset, cached_dataset, (10, 12, 2))
+        finally:
+            shutil.rmtree('test_targets_cache')
+
+    def test_cached_target_writable(self):
+        try:
+            dataset = InstanceSegmentationDataset(SimpleInstancesDataset())
+            cached_dataset = InstanceSegmentationDataset(SimpleInstancesDataset()).enable_target_cache('test_targets_cache')
+
+            target = cached_dataset[1]['target']
+            self.assertIs(type(target), np.ndarray)
+            target[target > 0] = 255
+            self.assertTrue(np.array_equal(cached_dataset[1]['target'], dataset[1]['target']))
+        finally:
+            shutil.rmtree('test_targets_cache')
+
+    def test_target_cache_border_after_cache(self):
+        try:
+            dataset = InstanceSegmentationDataset(SimpleInstancesDataset()).enable_border(2, 0)
+            cached_dataset = InstanceSegmentationDataset(SimpleInstancesDataset()).enable_target_cache('test_targets_cache').enable_border(2, 0)
+            self._check_cached(dataset, cached_dataset, (10, 12, 2))
+            self.assertEqual(len(os.listdir('test_targets_cache')), 2)  # cache built only for final borders configuration
+        finally:
+            shutil.rmtree('test_targets_cache')
+
+    def test_cached_dataset_pickling(self):
+        try:
+            dataset = InstanceSegmentationDataset(SimpleInstancesDataset())
+            cached_dataset = InstanceSegmentationDataset(SimpleInstancesDataset()).enable_target_cache('test_targets_cache')
+            cached_dataset[0]
+            self._check_cached(dataset, pickle.loads(pickle.dumps(cached_dataset)), (10, 12))
+        finally:
+            shutil.rmtree('test_targets_cache')
+
+    def test_target_cache_rebuild(self):
+        try:
+            InstanceSegmentationDataset(SimpleInstancesDataset(3)).enable_target_cache('test_targets_cache')[0]
+
+            dataset = InstanceSegmentationDataset(SimpleInstancesDataset(5))
+            cached_dataset = InstanceSegmentationDataset(SimpleInstancesDataset(5)).enable_target_cache('test_targets_cache')
+            self._check_cached(dataset, cached_dataset, (10, 12))
+        finally:
+            shutil.rmtree('test_targets_cache')
+
+
+class BatchCountingDataset(SimpleInstancesDataset):
+    def __init__(self, items_num: int = 3):
+        super().__init__(items_num)
+        self.batches = []
+
+    def __getitems__(self, indices: list) -> list:
+        self.batches.append(list(indices))
+        return super().__getitems__(indices)
+
+
+class WrappersBatchFetchingTest(unittest.TestCase):
+    def test_forwarding(self):
+        def wrap(dataset):
+            res = InstanceSegmentationDataset(dataset)
+            res = AugmentedDataset(EmptyClassesAdd(res, 3, 0)).add_aug(lambda t: t * 2, 'target')
+            return DataFlow(res).swap(['data'], ['idx']).swap(['target'], ['mask'])
+
+        dataset = BatchCountingDataset()
+        expected, res = [wrap(SimpleInstancesDataset())[i] for i in [2, 0]], wrap(dataset).__getitems__([2, 0])
+
+        self.assertEqual(dataset.batches, [[2, 0]])
+        self.assertEqual([r['idx'] for r in res], [e['idx'] for e in expected])
+        for r, e in zip(res, expected):
+            self.assertTrue(np.array_equal(r['mask'], e['mask']))
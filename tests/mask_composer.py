@@ -0,0 +1,99 @@
+import unittest
+
+import cv2
+import numpy as np
+
+from pietoolbelt.mask_composer import MasksComposer
+
+__all__ = ['MasksComposerTest']
+
+
+class MasksComposerTest(unittest.TestCase):
+    @staticmethod
+    def _reference(shape: tuple, masks: list, kernel: np.ndarray) -> [np.ndarray, np.ndarray]:
+        """
+        Compose masks and borders by full-frame calculation
+        """
+        res, borders = np.zeros(shape, dtype=np.uint8), np.zeros(shape, dtype=np.uint8)
+        for mask, offset in masks:
+            target = np.zeros(shape, dtype=np.uint8)
+            target[offset[0]: offset[0] + mask.shape[0], offset[1]: offset[1] + mask.shape[1]] = mask
+            borders[np.logical_and(cv2.dilate(res, kernel) > 0, cv2.dilate(target, kernel) > 0)] = 1
+            res = np.clip(res + target, 0, 1)
+        return res, borders
+
+    @staticmethod
+    def _random_masks(rng: np.random.Generator, shape: tuple, num: int) -> list:
+        masks = []
+        for _ in range(num):
+            h, w = rng.integers(1, 15, 2)
+            offset = np.array([rng.integers(0, shape[0] - h + 1), rng.integers(0, shape[1] - w + 1)])
+            masks.append(((rng.random((h, w)) > 0.3).astype(np.uint8), offset))
+        return masks
+
+    def test_masks_without_borders(self):
+        rng = np.random.default_rng(0)
+        masks = self._random_masks(rng, (30, 40), 5)
+
+        composer = MasksComposer((30, 40))
+        for mask, offset in masks:
+            composer.add_mask(mask, 0, offset=offset)
+
+        res = composer.compose()
+        self.assertEqual(res.shape, (30, 40))
+        self.assertTrue(np.array_equal(res, self._reference((30, 40), masks, np.ones((2, 2), dtype=np.uint8))[0]))
+
+    def test_borders_by_reference(self):
+        rng = np.random.default_rng(0)
+        for kernel_size in [(2, 2), (3, 3), (5, 4)]:
+            kernel = np.ones(kernel_size, dtype=np.uint8)
+            for _ in range(50):
+                shape = (int(rng.integers(20, 60)), int(rng.integers(20, 60)))
+                masks = self._random_masks(rng, shape, 6)
+
+                composer = MasksComposer(shape).add_borders_as_class([0], dilate_masks_kernel=kernel)
+                for mask, offset in masks:
+                    composer.add_mask(mask, 0, offset=offset)
+
+                res = composer.compose()
+                expected_mask, expected_borders = self._reference(shape, masks, kernel)
+                self.assertEqual(res.shape, shape + (2,))
+                self.assertTrue(np.array_equal(res[:, :, 0], expected_mask))
+                self.assertTrue(np.array_equal(res[:, :, 1], expected_borders))
+
+    def test_float_borders(self):
+        composer = MasksComposer((20, 20), dtype=np.float32).add_borders_as_class([0])
+        composer.add_mask(np.ones((5, 5), dtype=np.float32), 0, offset=[2, 2])
+        composer.add_mask(np.ones((5, 5), dtype=np.float32), 0, offset=[2, 7])
+
+        res = composer.compose()
+        self.assertEqual(res.dtype, np.float32)
+        self.assertTrue(res[:, :, 1].sum() > 0)
+
+    def test_mixed_borders_compose(self):
+        composer = MasksComposer((10, 12), classes_num=3).add_borders_as_class([1])
+        composer.add_mask(np.ones((2, 2), dtype=np.uint8), 0, offset=[0, 0])
+        composer.add_mask(np.ones((3, 3), dtype=np.uint8), 1, offset=[1, 1])
+        composer.add_mask(np.ones((3, 3), dtype=np.uint8), 1, offset=[1, 4])
+        composer.add_mask(np.ones((4, 4), dtype=np.uint8), 2, offset=[6, 8])
+
+        res = composer.compose()
+        self.assertEqual(res.shape, (10, 12, 4))
+        self.assertEqual(res[:, :, 0].sum(), 4)
+        self.assertEqual(res[:, :, 1].sum(), 18)
+        self.assertTrue(res[:, :, 2].sum() > 0)
+        self.assertEqual(res[:, :, 3].sum(), 16)
+
+    def test_all_borders_compose(self):
+        composer = MasksComposer((10, 12), classes_num=2).add_borders_as_class()
+        composer.add_mask(np.ones((2, 2), dtype=np.uint8), 1, offset=[3, 3])
+
+        res = composer.compose()
+        self.assertEqual(res.shape, (10, 12, 4))
+        self.assertEqual(res[:, :, 0].sum(), 0)
+        self.assertEqual(res[:, :, 2].sum(), 4)
+        self.assertEqual(res[:, :, 3].sum(), 0)
+
+    def test_class_out_of_range(self):
+        with self.assertRaises(IndexError):
+            MasksComposer((10, 12), classes_num=2).add_mask(np.ones((2, 2), dtype=np.uint8), 2)
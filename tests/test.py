@@ -5,6 +5,8 @@ from losses import *
 from datasets import *
 from models import *
 from tiles_utils import *
+from augmentations import *
+from mask_composer import *
 
 
 if __name__ == '__main__':